@@ -1,9 +1,24 @@
+from __future__ import annotations
+
 import os
-import json
-import requests
-import google.generativeai as genai
-from feedgen.feed import FeedGenerator
+import codecs
+import functools
+import math
+import time
+import random
+import hashlib
+import asyncio
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import httpx
+import diskcache
+import simdjson
+from lxml import etree
 from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
 
 # --- 設定項目：ここをカスタマイズしてください ---
 
@@ -23,48 +38,152 @@ RSS_FEED_TITLE = "AI厳選！契約書関連ニュース"
 RSS_FEED_DESCRIPTION = "AIがWebから自動収集した契約関連の最新ニュースです。（本文表示）"
 RSS_FILE_NAME = "feed.xml"
 
+# URLの重複判定の際に取り除くトラッキング用のクエリパラメータ
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "fbclid", "gclid",
+}
+
+# HTTP接続プールの上限、タイムアウト、一時的なエラー時のリトライ設定
+HTTP_POOL_SIZE = 32
+HTTP_TIMEOUT = 60  # 秒
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5  # 秒
+HTTP_RETRY_STATUSES = {429, 502, 503, 504}
+
+# Jina Readerで取得した記事本文のキャッシュ（GitHub Actionsの実行間で引き継ぐ）
+JINA_CACHE_DIR = ".cache/jina"
+JINA_CACHE_EXPIRE = 7 * 86400  # 秒
+
+# RSSフィードに掲載済みのURL（次回以降の実行では取得・分析を省略する）
+SEEN_URLS_DIR = ".cache/seen"
+SEEN_URLS_EXPIRE = 90 * 86400  # 秒
+
+# Jina Readerから読み込む記事本文の最大バイト数（長いページは途中で読み込みを打ち切る）
+JINA_MAX_BYTES = 64 * 1024
+
+# Jina Readerへの同時リクエスト数の上限
+JINA_CONCURRENCY = 8
+# 取得済み・未分析の記事を保持しておくキューの上限
+ARTICLE_QUEUE_SIZE = 16
+
+# Gemini APIの同時リクエスト数と1分あたりのリクエスト数(RPM)の上限
+GEMINI_CONCURRENCY = 4
+GEMINI_RPM = 15
+# レート制限(429)に達した場合の最大リトライ回数
+GEMINI_MAX_RETRIES = 4
+
+# ほぼ同一内容の記事にGeminiの過去の分析結果を再利用するためのキャッシュ
+SEMANTIC_CACHE_DIR = ".cache/gemini"
+GEMINI_EMBEDDING_MODEL = "models/text-embedding-004"
+SEMANTIC_CACHE_THRESHOLD = 0.95  # コサイン類似度がこの値を超えたら同一記事とみなす
+SEMANTIC_CACHE_MIN_CHARS = 500   # これより短い記事はキャッシュを使わない
+SEMANTIC_CACHE_TEXT_CHARS = 2000  # 埋め込みに使う記事冒頭の文字数
+SEMANTIC_CACHE_MAX_ENTRIES = 2000
+
+# 1回のGeminiリクエストでまとめて分析する記事の最大件数
+GEMINI_BATCH_SIZE = 8
+# Geminiに渡す1記事あたりの最大文字数（重要度の判定には記事冒頭で十分なため）
+# 記事本文はJina Readerで見出し行から始まるように整形済みなので、タイトルも含まれる
+GEMINI_ARTICLE_CHARS = 3000
+
+# Geminiの応答をJSONとして直接受け取るためのスキーマ
+GEMINI_RESPONSE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "index": {"type": "integer"},
+            "is_important": {"type": "boolean"},
+            "title": {"type": "string"},
+            "category": {"type": "string"},
+        },
+        "required": ["index", "is_important"],
+    },
+}
+
 # --- Gemini APIへの指示（プロンプト） ---
 GEMINI_PROMPT = """
 あなたは、日本企業の法務担当者や弁護士向けに情報提供を行う、非常に優秀なAIアシスタントです。
-以下のWeb記事の内容を分析し、契約実務、法改正、または関連するリーガルテックの動向について、専門家にとって価値のある重要な情報が含まれているか判断してください。
+以下の複数のWeb記事それぞれについて内容を分析し、契約実務、法改正、または関連するリーガルテックの動向について、専門家にとって価値のある重要な情報が含まれているか判断してください。
+各記事は「===ARTICLE i===」（iは0から始まる記事番号）という行で区切られています。
 
 判断基準：
 - 単なる製品紹介やイベント告知ではなく、実務に影響を与える具体的な情報（法改正、判例、新技術の法的論点など）を含んでいるか。
 - 専門家が目を通すべき、示唆に富んだ内容か。
 
-記事を分析した結果、重要だと判断した場合は、以下のJSON形式で結果を必ず出力してください。
-{{
-  "is_important": true,
-  "title": "（記事のタイトルを簡潔に要約）",
-  "category": "（「法改正」「電子契約」「判例」「M&A」「知財」など、最も適切なカテゴリを一つ）"
-}}
-
-重要ではない、または分析できないと判断した場合は、以下のJSON形式で出力してください。
-{{
-  "is_important": false
-}}
+記事ごとに1つずつ判定結果を返してください。
+- "index": 対応する記事番号
+- "is_important": 重要な情報を含むかどうか（分析できない場合も false）
+- "title": 重要な場合のみ、記事のタイトルを簡潔に要約したもの
+- "category": 重要な場合のみ、「法改正」「電子契約」「判例」「M&A」「知財」など、最も適切なカテゴリを一つ
 
 --- 記事本文 ---
-{article_text}
+{articles}
 """
+# 記事によらない指示部分。毎回同じ先頭部分を送ることで、サーバー側のプレフィックスキャッシュが効きやすくなる
+PROMPT_PREFIX = GEMINI_PROMPT.split("{articles}")[0]
 
 # --- メインのプログラム（ここから下は通常変更不要です） ---
 
 # APIキーを環境変数から読み込む
 try:
-    genai.configure(api_key=os.environ["GOOGLE_GEMINI_API_KEY"])
+    gemini_api_key = os.environ["GOOGLE_GEMINI_API_KEY"]
     tavily_api_key = os.environ["TAVILY_API_KEY"]
 except KeyError:
     print("エラー: APIキーが環境変数に設定されていません。")
     print("GitHub ActionsのSecretsに GOOGLE_GEMINI_API_KEY と TAVILY_API_KEY を設定してください。")
     exit(1)
 
+jina_cache = diskcache.Cache(JINA_CACHE_DIR)
+seen_urls = diskcache.Cache(SEEN_URLS_DIR)
+# パーサーは生成コストが大きいため使い回す（解析結果はすぐにdict/listへ変換すること）
+json_parser = simdjson.Parser()
+
+
+async def request_with_retry(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """一時的なエラー（接続・タイムアウト・通信エラーや429/5xx）の場合は指数バックオフで再試行しながらリクエストを送る
+
+    レスポンス本文は読み込まずに返すので、呼び出し側で必ず aclose() すること。
+    """
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        wait = HTTP_BACKOFF_FACTOR * 2 ** attempt
+        try:
+            response = await client.send(client.build_request(method, url, **kwargs), stream=True)
+        except httpx.TransportError:
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+            await asyncio.sleep(wait)
+            continue
+        if response.status_code in HTTP_RETRY_STATUSES and attempt < HTTP_MAX_RETRIES:
+            await response.aclose()
+            await asyncio.sleep(wait)
+            continue
+        return response
+
+@functools.cache
+def _init_genai():
+    """google.generativeaiは読み込みに時間がかかるため、初めて必要になった時点でimportして設定する"""
+    import google.generativeai as genai
+    genai.configure(api_key=gemini_api_key)
+    return genai
 
-def search_with_tavily(query: str, max_results: int = 5) -> list:
+def canonicalize_url(url: str) -> str:
+    """トラッキング用パラメータやフラグメントの違いを吸収した正規化済みURLを返す"""
+    parts = urlsplit(url)
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+async def search_with_tavily(client: httpx.AsyncClient, query: str, max_results: int = 5) -> list:
     """Tavily APIを使ってWeb検索し、URLのリストを返す"""
     print(f"🔍 検索中: '{query}'")
     try:
-        response = requests.post(
+        response = await request_with_retry(
+            client,
+            "POST",
             "https://api.tavily.com/search",
             json={
                 "api_key": tavily_api_key,
@@ -74,117 +193,331 @@ def search_with_tavily(query: str, max_results: int = 5) -> list:
                 "max_results": max_results
             }
         )
-        response.raise_for_status()
-        results = response.json().get("results", [])
+        try:
+            response.raise_for_status()
+            data = json_parser.parse(await response.aread()).as_dict()
+        finally:
+            await response.aclose()
+        results = data.get("results", [])
         urls = [res.get("url") for res in results if res.get("url")]
         print(f"✅ {len(urls)}件のURLが見つかりました。")
         return urls
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         print(f"❌ Tavily APIでの検索エラー: {e}")
         return []
 
-def get_article_content_from_jina(url: str) -> str | None:
+async def get_article_content_from_jina(client: httpx.AsyncClient, url: str) -> str | None:
     """Jina AI Readerを使ってURLから記事本文をMarkdown形式で抽出する"""
+    cache_key = hashlib.sha1(url.encode()).hexdigest()
+    cached = jina_cache.get(cache_key)
+    if cached is not None:
+        print(f"📦 キャッシュから記事取得: {url}")
+        return cached
     print(f"📄 記事取得中: {url}")
     jina_reader_url = f"https://r.jina.ai/{url}"
     try:
-        response = requests.get(jina_reader_url, timeout=60)
-        response.raise_for_status()
-        content = response.text
+        response = await request_with_retry(client, "GET", jina_reader_url)
+        try:
+            response.raise_for_status()
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes(8192):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= JINA_MAX_BYTES:
+                    break
+        finally:
+            await response.aclose()
+        # final=Falseで復号し、打ち切り位置で分断されたマルチバイト文字だけを捨てる
+        decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+        content = decoder.decode(b"".join(chunks)[:JINA_MAX_BYTES])
         lines = content.split('\n')
         for i, line in enumerate(lines):
             if line.strip().startswith('#'):
-                return '\n'.join(lines[i:])
+                content = '\n'.join(lines[i:])
+                break
+        jina_cache.set(cache_key, content, expire=JINA_CACHE_EXPIRE)
         return content
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ Jina Readerでの記事取得エラー: {e}")
         return None
 
-def analyze_with_gemini(article_text: str) -> dict | None:
-    """Gemini APIを使って記事を分析し、重要かどうかをJSON形式で返す"""
-    print("🧠 Geminiによる分析中...")
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    prompt = GEMINI_PROMPT.format(article_text=article_text)
+async def fetch_worker(client: httpx.AsyncClient, url_queue: asyncio.Queue, article_queue: asyncio.Queue):
+    """URLキューから記事を取得し、(URL, 本文)の組を分析用キューへ流す"""
+    while True:
+        try:
+            url = url_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        article_text = await get_article_content_from_jina(client, url)
+        if article_text:
+            await article_queue.put((url, article_text))
+
+class TokenBucket:
+    """一定のレートでトークンを補充し、リクエスト送信前に消費させるレート制限器"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = 1):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+async def analyze_with_gemini_batch(model: genai.GenerativeModel, bucket: TokenBucket, article_texts: list[str]) -> list[dict | None]:
+    """Gemini APIを使って複数の記事をまとめて分析し、記事ごとの判定結果を入力と同じ順で返す"""
+    from google.api_core.exceptions import ResourceExhausted
+
+    print(f"🧠 Geminiによる分析中... ({len(article_texts)}件)")
+    articles = "\n".join(
+        f"===ARTICLE {i}===\n{article_text[:GEMINI_ARTICLE_CHARS]}"
+        for i, article_text in enumerate(article_texts)
+    )
+    prompt = PROMPT_PREFIX + articles
+    results = [None] * len(article_texts)
+    response = None
     try:
-        response = model.generate_content(prompt)
-        cleaned_text = response.text.strip().replace("```json", "").replace("```", "").strip()
-        result = json.loads(cleaned_text)
-        print(f"✨ Geminiの分析完了: 重要か？ -> {result.get('is_important')}")
-        return result
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            await bucket.acquire()
+            try:
+                response = await model.generate_content_async(prompt)
+                break
+            except ResourceExhausted:
+                if attempt == GEMINI_MAX_RETRIES:
+                    raise
+                wait = 2 ** attempt + random.random()
+                print(f"⏳ Gemini APIのレート制限に達しました。{wait:.1f}秒後に再試行します。")
+                await asyncio.sleep(wait)
+        for i, result in enumerate(json_parser.parse(response.text.encode()).as_list()):
+            if not isinstance(result, dict):
+                continue
+            index = result.get("index", i)
+            if isinstance(index, int) and 0 <= index < len(results):
+                results[index] = result
+        important_count = sum(1 for result in results if result and result.get("is_important"))
+        print(f"✨ Geminiの分析完了: {len(article_texts)}件中 {important_count}件が重要")
     except Exception as e:
         print(f"❌ Gemini APIでの分析エラー: {e}")
-        try:
-            print(f"応答テキスト: {response.text[:200]}")
-        except NameError:
-            pass
+        if response is not None:
+            try:
+                print(f"応答テキスト: {response.text[:200]}")
+            except Exception:
+                pass
+    return results
+
+class SemanticCache:
+    """記事本文の埋め込みベクトルとGeminiの分析結果の組をディスクに保持するキャッシュ"""
+
+    def __init__(self, directory: str):
+        self.store = diskcache.Cache(directory)
+        self.entries = self.store.get("entries", [])
+
+    def lookup(self, embedding: list[float]) -> dict | None:
+        best_score, best_result = 0.0, None
+        for cached_embedding, result in self.entries:
+            score = sum(a * b for a, b in zip(embedding, cached_embedding))
+            if score > best_score:
+                best_score, best_result = score, result
+        if best_score > SEMANTIC_CACHE_THRESHOLD:
+            return best_result
         return None
 
+    def add(self, embedding: list[float], result: dict):
+        self.entries.append((embedding, result))
+        del self.entries[:-SEMANTIC_CACHE_MAX_ENTRIES]
 
-def main():
-    """メイン処理を実行する"""
-    print("🚀 プロジェクト開始")
+    def save(self):
+        self.store.set("entries", self.entries)
 
-    all_urls = set()
-    for query in SEARCH_QUERIES:
-        urls = search_with_tavily(query)
-        for url in urls:
-            all_urls.add(url)
+async def embed_articles(article_texts: list[str]) -> list[list[float] | None]:
+    """記事冒頭の埋め込みベクトルを1回のリクエストでまとめて取得し、正規化して返す（類似度を内積で計算するため）"""
+    try:
+        response = await _init_genai().embed_content_async(
+            model=GEMINI_EMBEDDING_MODEL,
+            content=[article_text[:SEMANTIC_CACHE_TEXT_CHARS] for article_text in article_texts],
+        )
+    except Exception as e:
+        print(f"❌ 埋め込みの取得エラー: {e}")
+        return [None] * len(article_texts)
+    embeddings = []
+    for embedding in response["embedding"]:
+        norm = math.sqrt(sum(x * x for x in embedding)) or 1.0
+        embeddings.append([x / norm for x in embedding])
+    return embeddings
 
-    print(f"\n合計 {len(all_urls)}件のユニークなURLを処理します。")
+async def analyze_batch(model: genai.GenerativeModel, bucket: TokenBucket, semantic_cache: SemanticCache, batch: list[tuple[str, str]], important_articles: list):
+    """類似記事のキャッシュに無い記事だけをまとめてGeminiで分析し、重要な記事をリストへ追加する"""
+    analysis_results = [None] * len(batch)
+    embeddings = [None] * len(batch)
+    targets = [i for i, (_, article_text) in enumerate(batch) if len(article_text) >= SEMANTIC_CACHE_MIN_CHARS]
+    if targets:
+        for i, embedding in zip(targets, await embed_articles([batch[i][1] for i in targets])):
+            embeddings[i] = embedding
+            if embedding is not None:
+                analysis_results[i] = semantic_cache.lookup(embedding)
+                if analysis_results[i] is not None:
+                    print(f"📦 類似記事の分析結果を再利用: {batch[i][0]}")
 
-    important_articles = []
-    for url in all_urls:
-        article_text = get_article_content_from_jina(url)
-        if article_text:
-            analysis_result = analyze_with_gemini(article_text)
-            if analysis_result and analysis_result.get("is_important"):
-                article_data = {
-                    'title': analysis_result.get("title", "No Title"),
-                    'category': analysis_result.get("category", "N/A"),
-                    'link': url,
-                    'full_text': article_text
-                }
-                important_articles.append(article_data)
-        print("-" * 20)
+    misses = [i for i, result in enumerate(analysis_results) if result is None]
+    if misses:
+        results = await analyze_with_gemini_batch(model, bucket, [batch[i][1] for i in misses])
+        for i, result in zip(misses, results):
+            analysis_results[i] = result
+            if result is not None and embeddings[i] is not None:
+                semantic_cache.add(embeddings[i], result)
 
-    if not important_articles:
-        print("😭 AIが重要と判断した記事はありませんでした。")
-        fg = FeedGenerator()
-        fg.title(RSS_FEED_TITLE)
-        fg.link(href=RSS_FEED_LINK, rel='alternate')
-        fg.description(RSS_FEED_DESCRIPTION)
-        fg.rss_file(RSS_FILE_NAME, pretty=True)
-        print("📝 空のRSSフィードを生成しました。")
-        return
+    for (url, article_text), analysis_result in zip(batch, analysis_results):
+        if analysis_result and analysis_result.get("is_important"):
+            important_articles.append({
+                'title': analysis_result.get("title", "No Title"),
+                'category': analysis_result.get("category", "N/A"),
+                'link': url,
+                'full_text': article_text
+            })
 
-    print(f"\n🎉 {len(important_articles)}件の重要記事をRSSフィードとして生成します。")
+async def analyze_worker(model: genai.GenerativeModel, bucket: TokenBucket, semantic_cache: SemanticCache, article_queue: asyncio.Queue, important_articles: list):
+    """分析用キューに溜まっている記事を最大GEMINI_BATCH_SIZE件ずつ取り出して分析する"""
+    finished = False
+    while not finished:
+        item = await article_queue.get()
+        if item is None:
+            return
+        batch = [item]
+        # Geminiの処理待ちで記事が溜まっていれば、1回のリクエストにまとめる
+        while len(batch) < GEMINI_BATCH_SIZE:
+            try:
+                item = article_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is None:
+                finished = True
+                break
+            batch.append(item)
+        await analyze_batch(model, bucket, semantic_cache, batch, important_articles)
 
-    # RSSフィードの生成
-    fg = FeedGenerator()
-    fg.title(RSS_FEED_TITLE)
-    fg.link(href=RSS_FEED_LINK, rel='alternate')
-    fg.description(RSS_FEED_DESCRIPTION)
 
-    for article in important_articles:
-        fe = fg.add_entry()
-        fe.title(article.get("title"))
-        fe.link(href=article.get("link"))
+def write_rss(articles: list):
+    """記事のリストからRSS 2.0フィードを組み立て、ファイルに保存する"""
+    rss = etree.Element("rss", version="2.0")
+    channel = etree.SubElement(rss, "channel")
+    etree.SubElement(channel, "title").text = RSS_FEED_TITLE
+    etree.SubElement(channel, "link").text = RSS_FEED_LINK
+    etree.SubElement(channel, "description").text = RSS_FEED_DESCRIPTION
+    etree.SubElement(channel, "lastBuildDate").text = format_datetime(datetime.now(timezone.utc))
+
+    for article in articles:
+        item = etree.SubElement(channel, "item")
+        etree.SubElement(item, "title").text = article.get("title")
+        etree.SubElement(item, "link").text = article.get("link")
 
         category = article.get("category", "N/A")
         full_text_content = article.get("full_text", "記事本文が取得できませんでした。")
 
-        # --- ここが修正箇所 ---
         # f-stringの中で '\n' を直接使うとエラーになるため、一度変数に格納してから使用する
         html_content = full_text_content.replace('\n', '<br/>')
 
-        # HTMLとしてdescriptionを構成する
-        fe.description(f"<b>【カテゴリ】: {category}</b><br/><br/><hr/><br/>{html_content}")
+        # HTMLとしてdescriptionを構成する（エスケープはlxmlが行う）
+        etree.SubElement(item, "description").text = (
+            f"<b>【カテゴリ】: {category}</b><br/><br/><hr/><br/>{html_content}"
+        )
+
+    etree.ElementTree(rss).write(RSS_FILE_NAME, pretty_print=True, xml_declaration=True, encoding="utf-8")
+
+
+async def process_urls(client: httpx.AsyncClient, urls: list[str]) -> list:
+    """記事の取得とGeminiによる分析をキューでつないで並行に進め、重要な記事のリストを返す"""
+    url_queue = asyncio.Queue()
+    for url in urls:
+        url_queue.put_nowait(url)
+
+    article_queue = asyncio.Queue(maxsize=ARTICLE_QUEUE_SIZE)
+    model = _init_genai().GenerativeModel(
+        'gemini-1.5-flash',
+        generation_config={
+            "response_mime_type": "application/json",
+            "response_schema": GEMINI_RESPONSE_SCHEMA,
+        },
+    )
+    bucket = TokenBucket(GEMINI_RPM)
+    semantic_cache = SemanticCache(SEMANTIC_CACHE_DIR)
+    important_articles = []
+
+    analyzers = [
+        asyncio.create_task(analyze_worker(model, bucket, semantic_cache, article_queue, important_articles))
+        for _ in range(GEMINI_CONCURRENCY)
+    ]
+    await asyncio.gather(
+        *[fetch_worker(client, url_queue, article_queue) for _ in range(JINA_CONCURRENCY)]
+    )
+    # 全ての取得が終わったら、分析ワーカーに終了の合図(None)を送る
+    for _ in analyzers:
+        await article_queue.put(None)
+    await asyncio.gather(*analyzers)
+    semantic_cache.save()
+    return important_articles
+
 
-    # RSSファイルを保存
-    fg.rss_file(RSS_FILE_NAME, pretty=True)
+async def main():
+    """メイン処理を実行する"""
+    print("🚀 プロジェクト開始")
+
+    # Tavilyへのリクエストは1本のHTTP/2接続上で多重化して送る。
+    # Jina Readerは本文を途中で読み捨てるため、HTTP/1.1のクライアントを使う
+    # （HTTP/2ではストリームを閉じても残りの本文が送られ続け、同じ接続上の他の取得まで詰まらせる。
+    # HTTP/1.1なら読み切っていない接続は破棄されるので、それ以上ダウンロードされない）
+    limits = httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+    async with (
+        httpx.AsyncClient(http2=True, limits=limits, timeout=HTTP_TIMEOUT) as client,
+        httpx.AsyncClient(limits=limits, timeout=HTTP_TIMEOUT) as jina_client,
+    ):
+        # 全クエリの検索を並行して実行する
+        tasks = [search_with_tavily(client, query) for query in SEARCH_QUERIES]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        all_urls = set()
+        for urls in results:
+            if isinstance(urls, BaseException):
+                print(f"❌ 検索タスクでの予期しないエラー: {urls}")
+                continue
+            all_urls.update(canonicalize_url(url) for url in urls)
+
+        # 過去のRSSフィードに掲載済みの記事は処理しない
+        new_urls = [url for url in all_urls if url not in seen_urls]
+        if len(new_urls) < len(all_urls):
+            print(f"⏭️ 掲載済みの {len(all_urls) - len(new_urls)}件のURLをスキップします。")
+
+        print(f"\n合計 {len(new_urls)}件のユニークなURLを処理します。")
+
+        # URLが全て掲載済みの場合は、Geminiの読み込みも含めて以降の処理を省略する
+        important_articles = await process_urls(jina_client, new_urls) if new_urls else []
+
+    if not important_articles:
+        print("😭 AIが重要と判断した記事はありませんでした。")
+        write_rss([])
+        print("📝 空のRSSフィードを生成しました。")
+        return
+
+    print(f"\n🎉 {len(important_articles)}件の重要記事をRSSフィードとして生成します。")
+
+    # RSSフィードを生成して保存
+    write_rss(important_articles)
     print(f"✅ RSSファイル '{RSS_FILE_NAME}' を作成しました。")
+
+    # 掲載した記事のURLを記録し、次回以降の実行では処理を省略する
+    for article in important_articles:
+        seen_urls.set(article["link"], True, expire=SEEN_URLS_EXPIRE)
     print("🏁 プロジェクト完了")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())